@@ -0,0 +1,27 @@
+"""Ahead-of-time build of the serial options kernel
+
+Run `python build_kernel.py` once to produce the `_options_kernel` extension
+module next to main.py. When it is present and was built from the current
+options_kernel.py, main.py runs analyses below _PARALLEL_MIN_SYMBOLS with it,
+without importing Numba or JIT-compiling anything.
+"""
+import os
+
+from numba.pycc import CC
+
+import options_kernel
+from main import _kernel_source_hash
+
+_SOURCE_HASH = _kernel_source_hash()
+
+cc = CC('_options_kernel')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+cc.export('compute', options_kernel.KERNEL_SIGNATURE)(options_kernel.options_kernel_serial)
+
+@cc.export('source_hash', 'i8()')
+def source_hash():
+    return _SOURCE_HASH
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"✅ Kernel built in: {cc.output_dir}")
@@ -1,33 +1,172 @@
+import numpy as np
 import pandas as pd
 from datetime import datetime
-import matplotlib.pyplot as plt
+import functools
+import hashlib
 import os
+import warnings
+
+try:
+    import xlsxwriter
+except ImportError:  # xlsxwriter is optional; save_to_excel() falls back to openpyxl
+    xlsxwriter = None
+
+# Column order of the analysis report
+COLUMNS = ('Symbol', 'Spot Price', '52W High', '52W Low', 'Percentile', 'Lot Size',
+           'CE Strike', 'CE Premium', 'CE IRR', 'PE Strike', 'PE Premium', 'PE IRR',
+           'Margin Used (%)')
+
+# IRR per unit of premium/strike: 15% margin over a 30-day expiry, annualized, in %
+_IRR_K = (365.0 / 30.0) / 0.15 * 100.0
+
+# Symbol count from which the kernel is run in per-core joblib chunks. The NSE F&O
+# universe (~200 symbols) is microseconds of kernel time, far below the cost of
+# starting a thread pool, so it stays on the single prange call; chunking only
+# pays for bulk runs where each chunk is at least milliseconds of work.
+_PARALLEL_MIN_SYMBOLS = 50000
+
+# Excel column widths for the fixed report schema
+_COL_WIDTHS = {'Symbol': 12, 'Spot Price': 12, '52W High': 10, '52W Low': 10, 'Percentile': 12,
+               'Lot Size': 10, 'CE Strike': 11, 'CE Premium': 12, 'CE IRR': 10, 'PE Strike': 11,
+               'PE Premium': 12, 'PE IRR': 10, 'Margin Used (%)': 17}
+
+def _kernel_source_hash():
+    """Hash of options_kernel.py, used to detect a stale AOT build"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'options_kernel.py')
+    with open(path, 'rb') as f:
+        return int(hashlib.sha256(f.read()).hexdigest()[:15], 16)
+
+def _load_aot_kernel():
+    """Serial kernel built by `python build_kernel.py`, or None if missing or stale"""
+    try:
+        import _options_kernel
+    except ImportError:
+        return None
+    if _options_kernel.source_hash() != _kernel_source_hash():
+        warnings.warn("_options_kernel was built from an older options_kernel.py and is ignored; "
+                      "rebuild it with `python build_kernel.py`")
+        return None
+    return _options_kernel.compute
+
+@functools.lru_cache(maxsize=None)
+def _get_kernel(kind):
+    """Kernel of the given kind, loaded or compiled on first use; None if unavailable
+    
+    Nothing is imported or compiled until the first analyze() asks for a kernel:
+    'single' runs a whole input below _PARALLEL_MIN_SYMBOLS in one call, with the
+    AOT build when it is current (no Numba import or JIT at all), else with the
+    'parallel' prange kernel. 'chunk' is the serial kernel for joblib threads
+    (None without joblib).
+    """
+    if kind == 'single':
+        kernel = _load_aot_kernel()
+        return kernel if kernel is not None else _get_kernel('parallel')
+    
+    try:
+        from numba import njit
+        import options_kernel
+    except ImportError:  # Numba is optional; analyze() falls back to NumPy
+        return None
+    
+    if kind == 'parallel':
+        return njit(options_kernel.KERNEL_SIGNATURE, parallel=True, nogil=True,
+                    fastmath=options_kernel.KERNEL_FASTMATH, cache=True)(
+                        options_kernel.options_kernel_parallel)
+    
+    try:
+        import joblib  # noqa: F401
+    except ImportError:  # joblib is optional; large runs use a single kernel call
+        return None
+    
+    # Serial kernel for chunked runs from joblib threads; nesting prange inside
+    # concurrent calls is unsupported by Numba's default workqueue threading layer.
+    # The AOT build is not used here: its pycc wrapper holds the GIL, so the
+    # chunks would run one after another.
+    return njit(options_kernel.KERNEL_SIGNATURE, nogil=True,
+                fastmath=options_kernel.KERNEL_FASTMATH, cache=True)(
+                    options_kernel.options_kernel_serial)
+
+def _nearest_strike(price, strike_interval=50):
+    """Nearest listed strike for a price or an ndarray of prices"""
+    if isinstance(price, np.ndarray):
+        return np.round(price / strike_interval) * strike_interval
+    return round(price / strike_interval) * strike_interval
+
+def _strike_with_margin(spot_price, margin_percent, is_call=True):
+    """Strike margin_percent below (call) or above (put) the nearest strike"""
+    nearest_strike = _nearest_strike(spot_price)
+    
+    if is_call:
+        target_price = nearest_strike * (1 - margin_percent / 100)
+    else:
+        target_price = nearest_strike * (1 + margin_percent / 100)
+    
+    return _nearest_strike(target_price)
+
+# Scalar strike queries are pure, so repeated ones (e.g. re-running with a
+# different margin in a notebook) are served from cache
+_nearest_strike_cached = functools.lru_cache(maxsize=4096)(_nearest_strike)
+_strike_with_margin_cached = functools.lru_cache(maxsize=4096)(_strike_with_margin)
 
 class OptionsAnalyzer:
     def __init__(self):
-        self.analysis_data = []
+        self._columns = {col: [] for col in COLUMNS}
+        self._df = None
+        self._records = None
         self.margin_percent = 15  # Default margin percentage
         self.lot_multiplier = 1   # Default lot multiplier
+    
+    @property
+    def analysis_data(self):
+        """Analysis results as a list of row dicts (empty before analyze() is run)
+        
+        The list is built from the column arrays on first access; changes to it are
+        only picked up by the save methods once it is assigned back.
+        """
+        if self._records is None:
+            df = self._get_df()
+            self._records = df.to_dict('records') if df is not None else []
+        return self._records
+    
+    @analysis_data.setter
+    def analysis_data(self, rows):
+        self._records = list(rows)
+        self._columns = {col: [row.get(col) for row in self._records] for col in COLUMNS}
+        self._df = None
+    
+    def _get_df(self):
+        """Build the results DataFrame once per analysis and cache it"""
+        if self._df is None and len(self._columns['Symbol']):
+            self._df = pd.DataFrame(self._columns, copy=False)
+        return self._df
         
     def calculate_percentile(self, current, high, low):
+        if isinstance(current, np.ndarray):
+            price_range = high - low
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(price_range == 0, 50.0, (current - low) / price_range * 100)
         if high == low:
             return 50.0
         return ((current - low) / (high - low)) * 100
     
     def find_nearest_strike(self, price, strike_interval=50):
-        return round(price / strike_interval) * strike_interval
+        if isinstance(price, np.ndarray):
+            return _nearest_strike(price, strike_interval)
+        return _nearest_strike_cached(price, strike_interval)
     
     def calculate_strike_with_margin(self, spot_price, margin_percent, is_call=True):
-        nearest_strike = self.find_nearest_strike(spot_price)
-        
-        if is_call:
-            target_price = nearest_strike * (1 - margin_percent / 100)
-        else:
-            target_price = nearest_strike * (1 + margin_percent / 100)
-        
-        return self.find_nearest_strike(target_price)
+        if isinstance(spot_price, np.ndarray):
+            return _strike_with_margin(spot_price, margin_percent, is_call)
+        return _strike_with_margin_cached(spot_price, margin_percent, is_call)
     
     def generate_option_premium(self, spot_price, strike_price, option_type):
+        if isinstance(spot_price, np.ndarray):
+            if option_type == 'CE':
+                intrinsic = np.maximum(spot_price - strike_price, 0.0)
+            else:
+                intrinsic = np.maximum(strike_price - spot_price, 0.0)
+            return intrinsic + spot_price * np.where(intrinsic > 0, 0.02, 0.01)
+        
         if option_type == 'CE':
             if spot_price > strike_price:
                 base_premium = (spot_price - strike_price) + (spot_price * 0.02)
@@ -39,160 +178,221 @@ class OptionsAnalyzer:
             else:
                 base_premium = spot_price * 0.01
         
-        return round(base_premium, 2)
+        return base_premium
     
     def calculate_irr(self, premium, strike_price, days_to_expiry=30):
+        if isinstance(strike_price, np.ndarray):
+            irr_k = _IRR_K if days_to_expiry == 30 else (365 / days_to_expiry) / 0.15 * 100
+            irr = np.zeros_like(strike_price, dtype=np.float64)
+            mask = strike_price != 0
+            irr[mask] = premium[mask] / strike_price[mask] * irr_k
+            return irr
         margin_required = strike_price * 0.15
         if margin_required == 0:
             return 0
-        irr = (premium / margin_required) * (365 / days_to_expiry) * 100
-        return round(irr, 2)
+        return (premium / margin_required) * (365 / days_to_expiry) * 100
     
     def get_sample_data(self):
-        """Sample stock data - Replace with actual NSE API calls"""
-        return [
-            {'symbol': 'NIFTY', 'spot_price': 19500, 'high_52w': 20000, 'low_52w': 18000, 'lot_size': 50},
-            {'symbol': 'BANKNIFTY', 'spot_price': 44500, 'high_52w': 46000, 'low_52w': 42000, 'lot_size': 25},
-            {'symbol': 'RELIANCE', 'spot_price': 2450, 'high_52w': 2650, 'low_52w': 2250, 'lot_size': 250},
-            {'symbol': 'TCS', 'spot_price': 3600, 'high_52w': 3850, 'low_52w': 3200, 'lot_size': 125},
-            {'symbol': 'INFY', 'spot_price': 1480, 'high_52w': 1600, 'low_52w': 1350, 'lot_size': 300},
-            {'symbol': 'HDFCBANK', 'spot_price': 1650, 'high_52w': 1750, 'low_52w': 1450, 'lot_size': 550},
-            {'symbol': 'ICICIBANK', 'spot_price': 950, 'high_52w': 1050, 'low_52w': 850, 'lot_size': 1375},
-            {'symbol': 'SBIN', 'spot_price': 590, 'high_52w': 650, 'low_52w': 520, 'lot_size': 1500},
-            {'symbol': 'BHARTIARTL', 'spot_price': 880, 'high_52w': 950, 'low_52w': 750, 'lot_size': 1220},
-            {'symbol': 'HINDUNILVR', 'spot_price': 2580, 'high_52w': 2800, 'low_52w': 2350, 'lot_size': 300}
-        ]
+        """Sample stock data as column arrays - Replace with actual NSE API calls"""
+        return {
+            'symbol': np.array(['NIFTY', 'BANKNIFTY', 'RELIANCE', 'TCS', 'INFY',
+                                'HDFCBANK', 'ICICIBANK', 'SBIN', 'BHARTIARTL', 'HINDUNILVR']),
+            'spot_price': np.array([19500, 44500, 2450, 3600, 1480, 1650, 950, 590, 880, 2580], dtype=np.float64),
+            'high_52w': np.array([20000, 46000, 2650, 3850, 1600, 1750, 1050, 650, 950, 2800], dtype=np.float64),
+            'low_52w': np.array([18000, 42000, 2250, 3200, 1350, 1450, 850, 520, 750, 2350], dtype=np.float64),
+            'lot_size': np.array([50, 25, 250, 125, 300, 550, 1375, 1500, 1220, 300], dtype=np.int64)
+        }
     
     def analyze(self):
         """Main analysis function"""
+        self._analyze()
+        return self.analysis_data
+    
+    def _analyze(self):
+        """Run the analysis into the column arrays, without building the row dicts"""
         print("🔄 Starting Options Analysis...")
+        self._df = None
+        self._records = None
         
         # Get stock data
         stocks = self.get_sample_data()
-        
-        for stock in stocks:
-            spot_price = stock['spot_price']
-            high_52w = stock['high_52w']
-            low_52w = stock['low_52w']
-            
-            # Calculate percentile
-            percentile = self.calculate_percentile(spot_price, high_52w, low_52w)
-            
-            # Calculate strikes
-            ce_strike = self.calculate_strike_with_margin(spot_price, self.margin_percent, is_call=True)
-            pe_strike = self.calculate_strike_with_margin(spot_price, self.margin_percent, is_call=False)
-            
-            # Generate premiums
-            ce_premium = self.generate_option_premium(spot_price, ce_strike, 'CE')
-            pe_premium = self.generate_option_premium(spot_price, pe_strike, 'PE')
-            
-            # Calculate IRR
-            ce_irr = self.calculate_irr(ce_premium, ce_strike)
-            pe_irr = self.calculate_irr(pe_premium, pe_strike)
-            
-            # Adjusted lot size
-            adjusted_lot_size = stock['lot_size'] * self.lot_multiplier
+        symbols = np.asarray(stocks['symbol'])
+        spot = np.asarray(stocks['spot_price'], dtype=np.float64)
+        high = np.asarray(stocks['high_52w'], dtype=np.float64)
+        low = np.asarray(stocks['low_52w'], dtype=np.float64)
+        lot = np.asarray(stocks['lot_size'], dtype=np.int64)
+        
+        n = len(spot)
+        chunk_kernel = _get_kernel('chunk') if n >= _PARALLEL_MIN_SYMBOLS else None
+        kernel = chunk_kernel or _get_kernel('single' if n < _PARALLEL_MIN_SYMBOLS else 'parallel')
+        
+        if kernel is not None:
+            percentile, ce_strike, pe_strike = np.empty(n), np.empty(n), np.empty(n)
+            ce_premium, pe_premium, ce_irr, pe_irr = np.empty(n), np.empty(n), np.empty(n), np.empty(n)
+            outputs = (percentile, ce_strike, pe_strike, ce_premium, pe_premium, ce_irr, pe_irr)
             
-            # Store data
-            row_data = {
-                'Symbol': stock['symbol'],
-                'Spot Price': spot_price,
-                '52W High': high_52w,
-                '52W Low': low_52w,
-                'Percentile': round(percentile, 2),
-                'Lot Size': adjusted_lot_size,
-                'CE Strike': ce_strike,
-                'CE Premium': ce_premium,
-                'CE IRR': round(ce_irr, 2),
-                'PE Strike': pe_strike,
-                'PE Premium': pe_premium,
-                'PE IRR': round(pe_irr, 2),
-                'Margin Used (%)': self.margin_percent
-            }
+            if chunk_kernel is not None:
+                from joblib import Parallel, delayed, cpu_count
+                
+                # Each chunk writes into its own slice of the output arrays
+                n_jobs = cpu_count()
+                bounds = np.linspace(0, n, n_jobs + 1).astype(np.int64)
+                Parallel(n_jobs=n_jobs, prefer='threads')(
+                    delayed(kernel)(spot[start:end], high[start:end], low[start:end],
+                                    float(self.margin_percent), _IRR_K,
+                                    *(out[start:end] for out in outputs))
+                    for start, end in zip(bounds[:-1], bounds[1:]) if end > start
+                )
+            else:
+                kernel(spot, high, low, float(self.margin_percent), _IRR_K, *outputs)
+        else:
+            from options_kernel import round_cents
             
-            self.analysis_data.append(row_data)
-        
-        print(f"✅ Analysis completed for {len(self.analysis_data)} symbols!")
-        return self.analysis_data
+            # round_cents() rather than np.round(), which differs from round(x, 2) at
+            # half-paisa ties (e.g. 444.755 -> 444.76) and would shift the IRRs too
+            percentile = round_cents(self.calculate_percentile(spot, high, low))
+            ce_strike = self.calculate_strike_with_margin(spot, self.margin_percent, is_call=True)
+            pe_strike = self.calculate_strike_with_margin(spot, self.margin_percent, is_call=False)
+            ce_premium = round_cents(self.generate_option_premium(spot, ce_strike, 'CE'))
+            pe_premium = round_cents(self.generate_option_premium(spot, pe_strike, 'PE'))
+            ce_irr = round_cents(self.calculate_irr(ce_premium, ce_strike))
+            pe_irr = round_cents(self.calculate_irr(pe_premium, pe_strike))
+        
+        # Store data
+        self._columns['Symbol'] = symbols
+        self._columns['Spot Price'] = spot
+        self._columns['52W High'] = high
+        self._columns['52W Low'] = low
+        self._columns['Percentile'] = percentile
+        self._columns['Lot Size'] = lot * self.lot_multiplier
+        self._columns['CE Strike'] = ce_strike
+        self._columns['CE Premium'] = ce_premium
+        self._columns['CE IRR'] = ce_irr
+        self._columns['PE Strike'] = pe_strike
+        self._columns['PE Premium'] = pe_premium
+        self._columns['PE IRR'] = pe_irr
+        self._columns['Margin Used (%)'] = np.full(len(symbols), self.margin_percent)
+        
+        print(f"✅ Analysis completed for {len(symbols)} symbols!")
     
     def save_to_excel(self, filename=None):
         """Save analysis to Excel file"""
-        if not self.analysis_data:
+        df = self._get_df()
+        if df is None:
             print("❌ No data to export. Run analyze() first.")
             return
         
-        # Create DataFrame
-        df = pd.DataFrame(self.analysis_data)
-        
         # Generate filename if not provided
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"Options_Analysis_{timestamp}.xlsx"
         
         # Export to Excel
-        with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Options Analysis', index=False)
+        if xlsxwriter is not None:
+            # Stream rows to disk; constant_memory mode requires row-by-row writes,
+            # which DataFrame.to_excel does not do
+            workbook = xlsxwriter.Workbook(filename, {'constant_memory': True})
+            worksheet = workbook.add_worksheet('Options Analysis')
+            header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center'})
+            
+            for idx, col in enumerate(COLUMNS):
+                worksheet.set_column(idx, idx, _COL_WIDTHS.get(col, 14))
+            worksheet.write_row(0, 0, COLUMNS, header_format)
             
-            # Auto-adjust column widths
-            worksheet = writer.sheets['Options Analysis']
-            for idx, col in enumerate(df.columns):
-                max_length = max(df[col].astype(str).apply(len).max(), len(col)) + 2
-                worksheet.column_dimensions[chr(65 + idx)].width = min(max_length, 20)
+            rows = zip(*(df[col].tolist() for col in COLUMNS))
+            for row_idx, row in enumerate(rows, start=1):
+                worksheet.write_row(row_idx, 0, row)
+            workbook.close()
+        else:
+            from openpyxl.utils import get_column_letter
+            
+            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+                df.to_excel(writer, sheet_name='Options Analysis', index=False, columns=list(COLUMNS))
+                
+                # Set column widths
+                worksheet = writer.sheets['Options Analysis']
+                for idx, col in enumerate(COLUMNS):
+                    worksheet.column_dimensions[get_column_letter(idx + 1)].width = _COL_WIDTHS.get(col, 14)
         
         print(f"✅ Excel file saved: {filename}")
         return filename
     
     def save_graphs(self, filename=None):
         """Generate and save all graphs"""
-        if not self.analysis_data:
+        df = self._get_df()
+        if df is None:
             print("❌ No data to plot. Run analyze() first.")
             return
         
         print("📊 Generating graphs...")
         
-        # Create DataFrame
-        df = pd.DataFrame(self.analysis_data)
+        # Imported here so Excel-only runs don't pay for matplotlib
+        import matplotlib
         
         # Generate filename if not provided
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"Options_Analysis_Graphs_{timestamp}.png"
         
+        # Scoped so the caller's own plots keep their rcParams
+        with matplotlib.rc_context({'path.simplify_threshold': 1.0, 'agg.path.chunksize': 10000}):
+            self._draw_dashboard(df, filename)
+        
+        print(f"✅ Graphs saved: {filename}")
+        return filename
+    
+    def _draw_dashboard(self, df, filename):
+        """Draw the six-chart dashboard and render it to filename"""
+        # Figures are built without pyplot and rendered straight to an Agg canvas
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        
         # Create figure with subplots
-        fig, axes = plt.subplots(2, 3, figsize=(16, 10))
+        fig = Figure(figsize=(16, 10))
+        canvas = FigureCanvasAgg(fig)
+        axes = fig.subplots(2, 3)
         fig.suptitle('NSE Options Trading Analysis Dashboard', fontsize=18, fontweight='bold', y=0.995)
         
-        x = range(len(df))
+        # Plot from raw arrays; the columns share one index so no alignment is needed
+        symbols = df['Symbol'].values
+        spot = df['Spot Price'].values
+        percentile = df['Percentile'].values
+        ce_strike, pe_strike = df['CE Strike'].values, df['PE Strike'].values
+        ce_premium, pe_premium = df['CE Premium'].values, df['PE Premium'].values
+        ce_irr, pe_irr = df['CE IRR'].values, df['PE IRR'].values
+        
+        x = np.arange(len(df))
         width = 0.35
+        x_left, x_right = x - width/2, x + width/2
         
         # 1. IRR Comparison (CE vs PE)
         ax1 = axes[0, 0]
-        ax1.bar([i - width/2 for i in x], df['CE IRR'], width, label='CE IRR', color='#667eea', alpha=0.8)
-        ax1.bar([i + width/2 for i in x], df['PE IRR'], width, label='PE IRR', color='#f093fb', alpha=0.8)
+        ax1.bar(x_left, ce_irr, width, label='CE IRR', color='#667eea', alpha=0.8)
+        ax1.bar(x_right, pe_irr, width, label='PE IRR', color='#f093fb', alpha=0.8)
         ax1.set_xlabel('Symbol', fontsize=10, fontweight='bold')
         ax1.set_ylabel('IRR (%)', fontsize=10, fontweight='bold')
         ax1.set_title('Call vs Put IRR Comparison', fontsize=12, fontweight='bold')
         ax1.set_xticks(x)
-        ax1.set_xticklabels(df['Symbol'], rotation=45, ha='right', fontsize=9)
+        ax1.set_xticklabels(symbols)
         ax1.legend(fontsize=9)
         ax1.grid(True, alpha=0.3)
         
         # 2. Premium Comparison
         ax2 = axes[0, 1]
-        ax2.bar([i - width/2 for i in x], df['CE Premium'], width, label='CE Premium', color='#4facfe', alpha=0.8)
-        ax2.bar([i + width/2 for i in x], df['PE Premium'], width, label='PE Premium', color='#00f2fe', alpha=0.8)
+        ax2.bar(x_left, ce_premium, width, label='CE Premium', color='#4facfe', alpha=0.8)
+        ax2.bar(x_right, pe_premium, width, label='PE Premium', color='#00f2fe', alpha=0.8)
         ax2.set_xlabel('Symbol', fontsize=10, fontweight='bold')
         ax2.set_ylabel('Premium (₹)', fontsize=10, fontweight='bold')
         ax2.set_title('Call vs Put Premium Comparison', fontsize=12, fontweight='bold')
         ax2.set_xticks(x)
-        ax2.set_xticklabels(df['Symbol'], rotation=45, ha='right', fontsize=9)
+        ax2.set_xticklabels(symbols)
         ax2.legend(fontsize=9)
         ax2.grid(True, alpha=0.3)
         
         # 3. 52-Week Percentile
         ax3 = axes[0, 2]
-        colors = ['#43e97b' if p >= 50 else '#fa709a' for p in df['Percentile']]
-        bars = ax3.barh(df['Symbol'], df['Percentile'], color=colors, alpha=0.8)
+        colors = np.where(percentile >= 50, '#43e97b', '#fa709a')
+        bars = ax3.barh(symbols, percentile, color=colors, alpha=0.8)
         ax3.set_xlabel('Percentile (%)', fontsize=10, fontweight='bold')
         ax3.set_title('52-Week Price Percentile', fontsize=12, fontweight='bold')
         ax3.axvline(x=50, color='red', linestyle='--', linewidth=2, label='50% Mark')
@@ -200,30 +400,26 @@ class OptionsAnalyzer:
         ax3.grid(True, alpha=0.3, axis='x')
         
         # Add value labels
-        for i, bar in enumerate(bars):
-            width_val = bar.get_width()
-            ax3.text(width_val + 1, bar.get_y() + bar.get_height()/2, 
-                    f'{width_val:.1f}%', va='center', fontsize=8)
+        ax3.bar_label(bars, fmt='%.1f%%', padding=2, fontsize=8)
         
         # 4. Spot Price vs Strikes
         ax4 = axes[1, 0]
-        ax4.plot(df['Symbol'], df['Spot Price'], marker='o', label='Spot Price', 
+        ax4.plot(symbols, spot, marker='o', label='Spot Price', 
                 linewidth=2.5, markersize=8, color='#667eea')
-        ax4.plot(df['Symbol'], df['CE Strike'], marker='s', label='CE Strike', 
+        ax4.plot(symbols, ce_strike, marker='s', label='CE Strike', 
                 linewidth=2, markersize=6, color='#4facfe', linestyle='--')
-        ax4.plot(df['Symbol'], df['PE Strike'], marker='^', label='PE Strike', 
+        ax4.plot(symbols, pe_strike, marker='^', label='PE Strike', 
                 linewidth=2, markersize=6, color='#f093fb', linestyle='--')
         ax4.set_xlabel('Symbol', fontsize=10, fontweight='bold')
         ax4.set_ylabel('Price (₹)', fontsize=10, fontweight='bold')
         ax4.set_title('Spot Price vs Strike Prices', fontsize=12, fontweight='bold')
         ax4.legend(fontsize=9)
         ax4.grid(True, alpha=0.3)
-        plt.setp(ax4.xaxis.get_majorticklabels(), rotation=45, ha='right', fontsize=9)
         
         # 5. Average IRR by Type
         ax5 = axes[1, 1]
-        avg_ce_irr = df['CE IRR'].mean()
-        avg_pe_irr = df['PE IRR'].mean()
+        avg_ce_irr = ce_irr.mean()
+        avg_pe_irr = pe_irr.mean()
         bars = ax5.bar(['Call Options', 'Put Options'], [avg_ce_irr, avg_pe_irr], 
                color=['#667eea', '#f093fb'], alpha=0.8, width=0.6)
         ax5.set_ylabel('Average IRR (%)', fontsize=10, fontweight='bold')
@@ -231,36 +427,39 @@ class OptionsAnalyzer:
         ax5.grid(True, alpha=0.3, axis='y')
         
         # Add value labels
-        for bar in bars:
-            height = bar.get_height()
-            ax5.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                    f'{height:.2f}%', ha='center', va='bottom', fontweight='bold', fontsize=10)
+        ax5.bar_label(bars, fmt='%.2f%%', padding=2, fontweight='bold', fontsize=10)
         
         # 6. Premium to Strike Ratio
         ax6 = axes[1, 2]
-        df['CE_Ratio'] = (df['CE Premium'] / df['CE Strike']) * 100
-        df['PE_Ratio'] = (df['PE Premium'] / df['PE Strike']) * 100
-        ax6.scatter(df['Symbol'], df['CE_Ratio'], s=120, alpha=0.7, 
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ce_ratio = ce_premium / ce_strike * 100
+            pe_ratio = pe_premium / pe_strike * 100
+        ax6.scatter(symbols, ce_ratio, s=120, alpha=0.7, 
                    label='CE Ratio', color='#667eea', edgecolors='black', linewidth=0.5)
-        ax6.scatter(df['Symbol'], df['PE_Ratio'], s=120, alpha=0.7, 
+        ax6.scatter(symbols, pe_ratio, s=120, alpha=0.7, 
                    label='PE Ratio', color='#f093fb', edgecolors='black', linewidth=0.5)
         ax6.set_xlabel('Symbol', fontsize=10, fontweight='bold')
         ax6.set_ylabel('Premium/Strike Ratio (%)', fontsize=10, fontweight='bold')
         ax6.set_title('Premium to Strike Price Ratio', fontsize=12, fontweight='bold')
         ax6.legend(fontsize=9)
         ax6.grid(True, alpha=0.3)
-        plt.setp(ax6.xaxis.get_majorticklabels(), rotation=45, ha='right', fontsize=9)
         
-        plt.tight_layout()
+        # Symbol tick labels shared by the per-symbol charts
+        for ax in (ax1, ax2, ax4, ax6):
+            ax.tick_params(axis='x', labelrotation=45, labelsize=9)
+            for label in ax.get_xticklabels():
+                label.set_horizontalalignment('right')
         
-        # Save to file
-        fig.savefig(filename, dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close(fig)
+        fig.tight_layout()
         
-        print(f"✅ Graphs saved: {filename}")
-        return filename
+        # Composite each chart at the target dpi (matters for vector output formats)
+        for ax in axes.flat:
+            ax.set_rasterized(True)
+        
+        # Save to file
+        canvas.print_figure(filename, dpi=120, bbox_inches='tight', facecolor='white')
     
-    def run(self, margin_percent=15, lot_multiplier=1):
+    def run(self, margin_percent=15, lot_multiplier=1, graphs=True):
         """Run complete analysis and save outputs"""
         print("\n" + "="*60)
         print("🚀 NSE OPTIONS TRADING ANALYZER")
@@ -273,22 +472,24 @@ class OptionsAnalyzer:
         print(f"\n⚙️  Configuration:")
         print(f"   - Margin Percentage: {margin_percent}%")
         print(f"   - Lot Size Multiplier: {lot_multiplier}x")
+        print(f"   - Graphs: {'Yes' if graphs else 'No'}")
         print()
         
         # Run analysis
-        self.analyze()
+        self._analyze()
         
         # Save to Excel
         excel_file = self.save_to_excel()
         
         # Save graphs
-        graph_file = self.save_graphs()
+        graph_file = self.save_graphs() if graphs else None
         
         print("\n" + "="*60)
         print("✨ ANALYSIS COMPLETE!")
         print("="*60)
         print(f"📄 Excel Report: {excel_file}")
-        print(f"📊 Graphs: {graph_file}")
+        if graph_file is not None:
+            print(f"📊 Graphs: {graph_file}")
         print("="*60 + "\n")
         
         return excel_file, graph_file
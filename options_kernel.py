@@ -0,0 +1,87 @@
+"""Strike/premium/IRR kernel shared by main.py (JIT/NumPy) and build_kernel.py (AOT)
+
+Importing this module compiles nothing: the loop functions are compiled by
+their callers, and the helpers are only compiled when inlined into them.
+Without Numba the module still imports, for the NumPy path's round_cents().
+"""
+import numpy as np
+
+try:
+    from numba import prange
+    from numba.extending import register_jitable
+except ImportError:  # NumPy-only installs use round_cents() alone; the loops are never compiled
+    prange = range
+    
+    def register_jitable(**options):
+        return lambda func: func
+
+# Signature shared by the JIT and AOT builds of the kernel
+KERNEL_SIGNATURE = 'void(f8[:], f8[:], f8[:], f8, f8, f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8[:])'
+
+# Only the IEEE-safe fastmath flags: reassociation or reciprocal approximation
+# could move a value across a strike rounding boundary
+KERNEL_FASTMATH = {'nnan', 'ninf', 'nsz'}
+
+@register_jitable(inline='always')
+def round_cents(x):
+    """x rounded to 2 decimals like the builtin round(x, 2), for a float or an ndarray
+    
+    np.rint(x * 100) rounds the product rather than x: 444.755 is stored as
+    444.75499..., yet x * 100 comes out as exactly 44475.5 and rounds up. The
+    product's rounding error (exact via Dekker's split, as 100 needs only 7 bits)
+    decides such ties the way round() does; true ties still round half to even.
+    """
+    scaled = x * 100.0
+    cents = np.rint(scaled)
+    split = x * 134217729.0  # 2**27 + 1
+    x_hi = split - (split - x)
+    error = (x_hi * 100.0 - scaled) + (x - x_hi) * 100.0
+    floor = np.floor(scaled)
+    tie = (scaled - floor) == 0.5
+    cents = cents + tie * ((error > 0) * (floor + 1.0 - cents) + (error < 0) * (floor - cents))
+    return cents / 100.0
+
+@register_jitable(inline='always')
+def _options_row(i, spot, high, low, margin_percent, irr_k,
+                 percentile, ce_strike, pe_strike, ce_premium, pe_premium, ce_irr, pe_irr):
+    """Strike/premium/IRR math for symbol i"""
+    spot_i = spot[i]
+    
+    # Calculate percentile
+    if high[i] != low[i]:
+        percentile[i] = round_cents((spot_i - low[i]) / (high[i] - low[i]) * 100)
+    else:
+        percentile[i] = 50.0
+    
+    # Calculate strikes (margin is applied to the nearest strike)
+    nearest = np.rint(spot_i / 50) * 50
+    ce = np.rint(nearest * (1 - margin_percent / 100) / 50) * 50
+    pe = np.rint(nearest * (1 + margin_percent / 100) / 50) * 50
+    ce_strike[i] = ce
+    pe_strike[i] = pe
+    
+    # Generate premiums (intrinsic value + time value, written as selects)
+    ce_itm = max(spot_i - ce, 0.0)
+    pe_itm = max(pe - spot_i, 0.0)
+    ce_prem = round_cents(ce_itm + spot_i * (0.02 if ce_itm > 0 else 0.01))
+    pe_prem = round_cents(pe_itm + spot_i * (0.02 if pe_itm > 0 else 0.01))
+    ce_premium[i] = ce_prem
+    pe_premium[i] = pe_prem
+    
+    # Calculate IRR
+    ce_irr[i] = round_cents(ce_prem / ce * irr_k) if ce != 0 else 0.0
+    pe_irr[i] = round_cents(pe_prem / pe * irr_k) if pe != 0 else 0.0
+
+def options_kernel_parallel(spot, high, low, margin_percent, irr_k,
+                            percentile, ce_strike, pe_strike, ce_premium, pe_premium, ce_irr, pe_irr):
+    """All symbols in one loop, with prange spread over the cores"""
+    for i in prange(spot.shape[0]):
+        _options_row(i, spot, high, low, margin_percent, irr_k,
+                     percentile, ce_strike, pe_strike, ce_premium, pe_premium, ce_irr, pe_irr)
+
+def options_kernel_serial(spot, high, low, margin_percent, irr_k,
+                          percentile, ce_strike, pe_strike, ce_premium, pe_premium, ce_irr, pe_irr):
+    """Single-threaded loop over one chunk of symbols"""
+    for i in range(spot.shape[0]):
+        _options_row(i, spot, high, low, margin_percent, irr_k,
+                     percentile, ce_strike, pe_strike, ce_premium, pe_premium, ce_irr, pe_irr)
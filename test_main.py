@@ -0,0 +1,84 @@
+"""Regression check of the vectorized analyze() against the original per-row code
+
+Run with `python -m unittest test_main`.
+"""
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import main
+from options_kernel import round_cents
+
+def _reference_rows(stocks, margin_percent):
+    """The per-row analysis as it was before vectorization, with builtin round()"""
+    rows = []
+    for spot, high, low in zip(stocks['spot_price'].tolist(), stocks['high_52w'].tolist(),
+                               stocks['low_52w'].tolist()):
+        percentile = 50.0 if high == low else ((spot - low) / (high - low)) * 100
+        nearest = round(spot / 50) * 50
+        ce_strike = round(nearest * (1 - margin_percent / 100) / 50) * 50
+        pe_strike = round(nearest * (1 + margin_percent / 100) / 50) * 50
+        ce_premium = round((spot - ce_strike) + spot * 0.02 if spot > ce_strike else spot * 0.01, 2)
+        pe_premium = round((pe_strike - spot) + spot * 0.02 if spot < pe_strike else spot * 0.01, 2)
+        ce_irr = round((ce_premium / (ce_strike * 0.15)) * (365 / 30) * 100, 2) if ce_strike else 0
+        pe_irr = round((pe_premium / (pe_strike * 0.15)) * (365 / 30) * 100, 2) if pe_strike else 0
+        rows.append((round(percentile, 2), ce_strike, ce_premium, ce_irr, pe_strike, pe_premium, pe_irr))
+    return np.array(rows)
+
+class AnalyzeRegressionTest(unittest.TestCase):
+    def setUp(self):
+        # Two-decimal spot prices hit the half-paisa premium ties that np.round gets wrong
+        rng = np.random.default_rng(7)
+        n = 20000
+        spot = np.round(rng.uniform(20, 50000, n), 2)
+        self.stocks = {
+            'symbol': np.array([f'S{i}' for i in range(n)]),
+            'spot_price': spot,
+            'high_52w': np.round(spot * rng.uniform(1.0, 1.3, n), 2),
+            'low_52w': np.round(spot * rng.uniform(0.7, 1.0, n), 2),
+            'lot_size': rng.integers(25, 1500, n),
+        }
+
+    def _check(self, margin_percent=15):
+        analyzer = main.OptionsAnalyzer()
+        analyzer.margin_percent = margin_percent
+        analyzer.get_sample_data = lambda: self.stocks
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyzer.analyze()
+        df = analyzer._get_df()
+        got = df[['Percentile', 'CE Strike', 'CE Premium', 'CE IRR',
+                  'PE Strike', 'PE Premium', 'PE IRR']].to_numpy(dtype=np.float64)
+        expected = _reference_rows(self.stocks, margin_percent)
+
+        for col in (0, 1, 2, 4, 5):
+            np.testing.assert_array_equal(got[:, col], expected[:, col])
+        # The IRR constant is folded into one factor, which can move a value that
+        # sits on a rounding boundary by 0.01
+        for col in (3, 6):
+            np.testing.assert_allclose(got[:, col], expected[:, col], rtol=0, atol=0.01 + 1e-9)
+
+    def test_round_cents_tie(self):
+        # An OTM premium of 44475.50 * 0.01 = 444.755 is stored just below the tie
+        self.assertEqual(round_cents(44475.50 * 0.01), round(44475.50 * 0.01, 2))
+        np.testing.assert_array_equal(round_cents(np.array([444.755, 0.125, 2.675])), [444.75, 0.12, 2.67])
+
+    def test_default_kernel(self):
+        self._check()
+        self._check(margin_percent=7)
+
+    def test_numpy_fallback(self):
+        with mock.patch.object(main, '_get_kernel', lambda kind: None):
+            self._check()
+            self._check(margin_percent=7)
+
+    def test_chunked_kernel(self):
+        if main._get_kernel('chunk') is None:
+            self.skipTest("needs Numba and joblib")
+        with mock.patch.object(main, '_PARALLEL_MIN_SYMBOLS', 1):
+            self._check()
+
+if __name__ == "__main__":
+    unittest.main()